@@ -0,0 +1,305 @@
+"""API asyncio pentru citirea și scrierea meta datelor cu exiftool.
+
+Folosește procese exiftool persistente (`-stay_open True -@ -`) pornite cu
+`asyncio.create_subprocess_exec`, deci event loop-ul nu este blocat:
+
+    import async_exiftool
+
+    meta = await async_exiftool.read("poza.jpg")
+    metas = await async_exiftool.read_many(paths, tags=["Title", "IPTC:Keywords"])
+    await async_exiftool.write(paths, ["-Title=Gresie 60x60"])
+
+Numărul de procese (`workers`) limitează concurența. La timeout sau la
+anularea unui apel, procesul este resincronizat înaintea următoarei comenzi
+(se citește până la markerul comenzii abandonate) sau repornit, dacă nu
+răspunde.
+"""
+import asyncio
+import json
+import os
+import signal
+
+from metadata_io import DEFAULT_BATCH_SIZE, escape_value, iter_batches
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+# cât așteptăm terminarea unei comenzi abandonate înainte de a reporni procesul
+RESYNC_TIMEOUT = 10
+# limita buffer-ului de citire (JSON-ul unui lot mare poate depăși 64 KB)
+STREAM_LIMIT = 64 * 1024 * 1024
+
+
+def _check_args(args):
+    # argumentele sunt trimise ca linii ale unui argfile: o linie nouă ar începe un argument nou
+    for arg in args:
+        if "\n" in arg or "\r" in arg:
+            raise ValueError(f"Argument cu linie nouă (nu poate fi trimis lui exiftool): {arg!r}")
+
+
+def _escape_tag_args(tag_args) -> list:
+    """Valorile atribuite (`-TAG=valoare`) sunt codate ca entități HTML, pentru `-E`."""
+    args = ["-E"]
+    for arg in tag_args:
+        if arg.startswith("-") and "=" in arg:
+            name, value = arg.split("=", 1)
+            arg = f"{name}={escape_value(value)}"
+        args.append(arg)
+    return args
+
+
+def _remaining(deadline):
+    """Secundele rămase până la `deadline` (None = fără limită)."""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - asyncio.get_running_loop().time())
+
+
+def _raise_on_errors(stderr: str):
+    errors = [line for line in stderr.splitlines() if line.startswith("Error")]
+    if errors:
+        raise RuntimeError("\n".join(errors))
+
+
+class _ExifToolWorker:
+    """Un proces exiftool `-stay_open` care execută câte o comandă o dată."""
+
+    def __init__(self, executable: str):
+        self.executable = executable
+        self.proc = None
+        self._seq = 0
+        # numărul comenzii al cărei răspuns nu a fost citit complet
+        self._stale = None
+
+    async def start(self):
+        self.proc = await asyncio.create_subprocess_exec(
+            self.executable,
+            "-stay_open", "True",
+            "-@", "-",
+            "-common_args", "-charset", "filename=utf8",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT,
+        )
+        self._stale = None
+
+    async def restart(self):
+        if self.proc is not None and self.proc.returncode is None:
+            self.proc.kill()
+            await self.proc.wait()
+        await self.start()
+
+    async def close(self):
+        if self.proc is None or self.proc.returncode is not None:
+            return
+        try:
+            self.proc.stdin.write(b"-stay_open\nFalse\n")
+            await self.proc.stdin.drain()
+            await asyncio.wait_for(self.proc.wait(), RESYNC_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError):
+            self.proc.kill()
+            await self.proc.wait()
+
+    def terminate(self):
+        """Oprește procesul fără event loop (cel în care a fost pornit poate fi închis)."""
+        if self.proc is not None and self.proc.returncode is None:
+            try:
+                os.kill(self.proc.pid, signal.SIGTERM)
+            except OSError:
+                pass
+        self.proc = None
+
+    @staticmethod
+    async def _read_until(stream, marker: bytes) -> str:
+        data = await stream.readuntil(marker)
+        await stream.readline()  # restul liniei cu markerul
+        return data[: -len(marker)].decode("utf-8", "replace")
+
+    async def _read_response(self, seq: int):
+        marker = f"{{ready{seq}}}".encode()
+        return await asyncio.gather(
+            self._read_until(self.proc.stdout, marker),
+            self._read_until(self.proc.stderr, marker),
+        )
+
+    async def _resync(self, timeout=None):
+        """Citește și aruncă răspunsul comenzii abandonate (sau repornește).
+
+        Dacă răspunsul nu vine în `timeout` (cel mult RESYNC_TIMEOUT), procesul
+        este repornit în loc să fie așteptat mai departe.
+        """
+        if timeout is None or timeout > RESYNC_TIMEOUT:
+            timeout = RESYNC_TIMEOUT
+        try:
+            await asyncio.wait_for(self._read_response(self._stale), timeout)
+            self._stale = None
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            await self.restart()
+
+    async def execute(self, args, deadline=None):
+        """Rulează o comandă; returnează (stdout, stderr).
+
+        `deadline` (după `loop.time()`) limitează tot apelul, inclusiv resincronizarea.
+        """
+        if self.proc is None or self.proc.returncode is not None:
+            await self.start()
+        elif self._stale is not None:
+            await self._resync(_remaining(deadline))
+        if deadline is not None and _remaining(deadline) <= 0:
+            raise asyncio.TimeoutError
+
+        self._seq += 1
+        seq = self._seq
+        # -echo4 scrie markerul și pe stderr, după procesarea comenzii
+        lines = list(args) + ["-echo4", f"{{ready{seq}}}", f"-execute{seq}"]
+        self._stale = seq
+        self.proc.stdin.write(("\n".join(lines) + "\n").encode("utf-8"))
+        await self.proc.stdin.drain()
+        stdout, stderr = await asyncio.wait_for(self._read_response(seq), _remaining(deadline))
+        self._stale = None
+        return stdout, stderr
+
+
+class AsyncExifTool:
+    """Un grup de procese exiftool persistente, folosit din asyncio."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, executable: str = "exiftool", timeout=None):
+        self.workers = workers
+        self.executable = executable
+        self.timeout = timeout
+        self._all = []
+        self._idle = None
+        self._start_lock = asyncio.Lock()
+        # event loop-ul în care au fost pornite procesele
+        self._loop = None
+
+    @property
+    def loop(self):
+        return self._loop
+
+    async def start(self):
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            self._loop = asyncio.get_running_loop()
+            idle = asyncio.Queue()
+            for _ in range(self.workers):
+                worker = _ExifToolWorker(self.executable)
+                await worker.start()
+                self._all.append(worker)
+                idle.put_nowait(worker)
+            self._idle = idle
+
+    async def close(self):
+        if self._loop is not None and self._loop is not asyncio.get_running_loop():
+            # stream-urile proceselor aparțin altui event loop
+            self.discard()
+            return
+        workers, self._all, self._idle = self._all, [], None
+        self._loop = None
+        for worker in workers:
+            await worker.close()
+
+    def discard(self):
+        """Oprește procesele fără a aștepta după ele (ex: după ce event loop-ul s-a închis)."""
+        workers, self._all, self._idle = self._all, [], None
+        self._loop = None
+        for worker in workers:
+            worker.terminate()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def execute(self, args, timeout=None):
+        """Rulează o comandă pe primul proces liber; returnează (stdout, stderr).
+
+        `timeout` se aplică întregului apel: așteptarea unui proces liber,
+        resincronizarea lui și răspunsul comenzii.
+        """
+        args = list(args)
+        _check_args(args)
+        timeout = timeout or self.timeout
+        deadline = asyncio.get_running_loop().time() + timeout if timeout else None
+        if self._idle is None:
+            await self.start()
+        idle = self._idle
+        worker = await asyncio.wait_for(idle.get(), _remaining(deadline))
+        try:
+            return await worker.execute(args, deadline)
+        finally:
+            idle.put_nowait(worker)
+
+    async def read(self, filepath: str, tags=None, timeout=None) -> dict:
+        """Echivalentul async al `read_metadata` (chei `Grup:Tag`)."""
+        metas = await self._read_batch([filepath], tags, timeout)
+        return metas[0] if metas else {}
+
+    async def read_many(self, filepaths, tags=None, batch_size: int = DEFAULT_BATCH_SIZE, timeout=None) -> list:
+        """Citește mai multe fișiere în loturi, distribuite pe toate procesele."""
+        batches = list(iter_batches(filepaths, batch_size))
+        results = await asyncio.gather(
+            *(self._read_batch(batch, tags, timeout) for batch in batches)
+        )
+        return [meta for metas in results for meta in metas]
+
+    async def write(self, filepaths, tag_args, overwrite_original: bool = True, timeout=None) -> str:
+        """Scrie tag-urile (ex: `["-Title=...", "-Keywords="]`) în fișierele date.
+
+        Valorile pot conține linii noi (sunt trimise codate, cu `-E`).
+        """
+        args = _escape_tag_args(tag_args)
+        if overwrite_original:
+            args.append("-overwrite_original")
+        args += list(filepaths)
+        stdout, stderr = await self.execute(args, timeout)
+        _raise_on_errors(stderr)
+        return stdout
+
+    async def _read_batch(self, filepaths, tags, timeout) -> list:
+        args = ["-G1", "-j"] + [f"-{tag}" for tag in tags or []] + list(filepaths)
+        stdout, stderr = await self.execute(args, timeout)
+        if not stdout.strip():
+            _raise_on_errors(stderr)
+            return []
+        return json.loads(stdout)
+
+
+_default = None
+
+
+def _default_pool() -> AsyncExifTool:
+    """Grupul implicit, creat la prima utilizare pentru event loop-ul curent.
+
+    Procesele pornite într-un event loop anterior (ex: un alt `asyncio.run`)
+    nu pot fi folosite din cel curent, deci sunt oprite și grupul este refăcut.
+    """
+    global _default
+    if _default is not None and _default.loop not in (None, asyncio.get_running_loop()):
+        _default.discard()
+        _default = None
+    if _default is None:
+        _default = AsyncExifTool()
+    return _default
+
+
+async def read(filepath: str, tags=None, timeout=None) -> dict:
+    return await _default_pool().read(filepath, tags, timeout)
+
+
+async def read_many(filepaths, tags=None, batch_size: int = DEFAULT_BATCH_SIZE, timeout=None) -> list:
+    return await _default_pool().read_many(filepaths, tags, batch_size, timeout)
+
+
+async def write(filepaths, tag_args, overwrite_original: bool = True, timeout=None) -> str:
+    return await _default_pool().write(filepaths, tag_args, overwrite_original, timeout)
+
+
+async def close():
+    """Oprește procesele grupului implicit."""
+    global _default
+    if _default is not None:
+        pool, _default = _default, None
+        await pool.close()
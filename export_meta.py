@@ -0,0 +1,239 @@
+"""Export de meta date pentru o bibliotecă întreagă de imagini.
+
+Exemple:
+    python export_meta.py export.jsonl D:/Poze
+    python export_meta.py export.csv D:/Poze --tags Title IPTC:Keywords XMP-dc:Subject
+    python export_meta.py export.parquet D:/Poze --batch-size 500
+
+Fișierele sunt citite cu exiftool în loturi, iar rândurile fiecărui lot sunt
+scrise imediat, deci memoria folosită nu crește cu numărul de fișiere.
+
+JSONL conține toate cheile `Grup:Tag` citite. CSV și Parquet au coloane fixe:
+cu `--tags` câte o coloană pentru fiecare tag cerut, altfel format „lung”
+(SourceFile, Tag, Value) – un rând pentru fiecare tag.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from metadata_io import (
+    DEFAULT_BATCH_SIZE,
+    iter_batches,
+    iter_image_files,
+    missing_files,
+    read_metadata_batch,
+    split_tag_key,
+)
+
+FORMATS = ("jsonl", "csv", "parquet")
+LONG_COLUMNS = ["SourceFile", "Tag", "Value"]
+
+
+def format_value(value) -> str:
+    """Valoare ca text (listele devin „a, b, c”, ca la câmpul Keywords)."""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    return str(value)
+
+
+def project_meta(meta: dict, tags) -> dict:
+    """Păstrează doar tag-urile cerute, cu cheile exact cum au fost cerute.
+
+    Un tag fără grup (ex: `Keywords`) se potrivește cu primul `Grup:Keywords`.
+    """
+    row = {"SourceFile": meta.get("SourceFile")}
+    for wanted in tags:
+        if wanted in meta:
+            row[wanted] = meta[wanted]
+            continue
+        group, tag = split_tag_key(wanted)
+        row[wanted] = None
+        for key, value in meta.items():
+            key_group, key_tag = split_tag_key(key)
+            if key_tag == tag and (group is None or key_group == group):
+                row[wanted] = value
+                break
+    return row
+
+
+def table_rows(meta: dict, tags):
+    """Rândurile tabelare (CSV/Parquet) pentru meta datele unui fișier."""
+    if tags:
+        row = project_meta(meta, tags)
+        yield {key: format_value(value) for key, value in row.items()}
+        return
+    source = meta.get("SourceFile", "")
+    for key, value in meta.items():
+        if key == "SourceFile":
+            continue
+        yield {"SourceFile": source, "Tag": key, "Value": format_value(value)}
+
+
+class JsonlExportWriter:
+    def __init__(self, path: str, tags=None):
+        self.tags = tags
+        self.file = open(path, "w", encoding="utf-8", newline="\n")
+
+    def write_batch(self, metas):
+        for meta in metas:
+            row = project_meta(meta, self.tags) if self.tags else meta
+            self.file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class CsvExportWriter:
+    def __init__(self, path: str, tags=None):
+        self.tags = tags
+        self.file = open(path, "w", encoding="utf-8-sig", newline="")
+        columns = ["SourceFile"] + list(tags) if tags else LONG_COLUMNS
+        self.writer = csv.DictWriter(self.file, fieldnames=columns)
+        self.writer.writeheader()
+
+    def write_batch(self, metas):
+        for meta in metas:
+            self.writer.writerows(table_rows(meta, self.tags))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetExportWriter:
+    def __init__(self, path: str, tags=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError(
+                "Exportul Parquet are nevoie de pachetul `pyarrow` (pip install pyarrow)."
+            )
+        self.pa = pa
+        self.tags = tags
+        self.columns = ["SourceFile"] + list(tags) if tags else LONG_COLUMNS
+        self.schema = pa.schema([(name, pa.string()) for name in self.columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write_batch(self, metas):
+        columns = {name: [] for name in self.columns}
+        for meta in metas:
+            for row in table_rows(meta, self.tags):
+                for name in self.columns:
+                    columns[name].append(row.get(name))
+        if columns["SourceFile"]:
+            # fiecare lot devine un row group separat
+            self.writer.write_table(self.pa.table(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {
+    "jsonl": JsonlExportWriter,
+    "csv": CsvExportWriter,
+    "parquet": ParquetExportWriter,
+}
+
+
+def export_metadata(
+    paths,
+    output: str,
+    fmt: str = None,
+    tags=None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    recursive: bool = True,
+    progress=None,
+    on_error=None,
+) -> int:
+    """Exportă meta datele fișierelor date în `output`; returnează numărul de fișiere.
+
+    Un lot care nu poate fi citit (ex: toate fișierele lui au fost șterse între
+    timp) este sărit; `on_error(fișiere, mesaj)` este apelat pentru fiecare astfel
+    de lot și pentru fișierele lipsă din loturile citite parțial.
+    """
+    fmt = fmt or os.path.splitext(output)[1].lstrip(".").lower()
+    if fmt not in WRITERS:
+        raise ValueError(f"Format necunoscut: {fmt!r} (acceptat: {', '.join(FORMATS)})")
+
+    writer = WRITERS[fmt](output, tags)
+    count = 0
+    try:
+        for batch in iter_batches(iter_image_files(paths, recursive), batch_size):
+            try:
+                metas = read_metadata_batch(batch, tags)
+            except (RuntimeError, ValueError) as e:
+                if on_error:
+                    on_error(batch, str(e))
+                continue
+            if on_error and len(metas) < len(batch):
+                # exiftool omite din JSON fișierele pe care nu le-a putut citi
+                missing = missing_files(batch, metas)
+                if missing:
+                    on_error(missing, "fișierele nu au putut fi citite")
+            writer.write_batch(metas)
+            count += len(metas)
+            if progress:
+                progress(count)
+    finally:
+        writer.close()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Exportă meta datele imaginilor în JSONL, CSV sau Parquet."
+    )
+    parser.add_argument("output", help="Fișierul rezultat (.jsonl, .csv sau .parquet)")
+    parser.add_argument("paths", nargs="+", help="Fișiere și/sau directoare de imagini")
+    parser.add_argument("--format", choices=FORMATS, help="Formatul (implicit după extensie)")
+    parser.add_argument(
+        "--tags",
+        nargs="+",
+        metavar="GRUP:TAG",
+        help="Exportă doar aceste tag-uri (ex: Title IPTC:Keywords XMP-dc:Subject)",
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--no-recursive", action="store_true", help="Nu intra în subdirectoare"
+    )
+    args = parser.parse_args(argv)
+
+    def progress(count):
+        print(f"\r{count} fișier(e) exportate", end="", file=sys.stderr, flush=True)
+
+    skipped = []
+
+    def on_error(filepaths, message):
+        skipped.extend(filepaths)
+        print(f"\n{len(filepaths)} fișier(e) sărite: {message.strip()}", file=sys.stderr)
+
+    try:
+        count = export_metadata(
+            args.paths,
+            args.output,
+            fmt=args.format,
+            tags=args.tags,
+            batch_size=args.batch_size,
+            recursive=not args.no_recursive,
+            progress=progress,
+            on_error=on_error,
+        )
+    except FileNotFoundError:
+        parser.exit(1, "\nNu am găsit 'exiftool'. Asigură-te că este instalat și în PATH.\n")
+    except (RuntimeError, ValueError) as e:
+        parser.exit(1, f"\nEroare: {e}\n")
+    print(f"\rExport terminat: {count} fișier(e) în {args.output}", file=sys.stderr)
+    if skipped:
+        print(f"{len(skipped)} fișier(e) nu au putut fi citite:", file=sys.stderr)
+        for path in skipped:
+            print(f"  {path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
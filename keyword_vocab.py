@@ -0,0 +1,204 @@
+import json
+import os
+import tempfile
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+from metadata_io import APP_DATA_DIR
+
+DEFAULT_VOCAB_PATH = os.path.join(APP_DATA_DIR, "keywords.json")
+
+# Tag-urile (fără grup) din care colectăm cuvinte cheie
+KEYWORD_TAGS = {"Keywords", "Subject"}
+# câte fișiere deja numărate sunt ținute minte (cele mai vechi sunt uitate)
+MAX_TRACKED_FILES = 5000
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Formă de comparație: fără diacritice, fără majuscule, spații compactate."""
+    decomposed = unicodedata.normalize("NFKD", keyword)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def split_keywords(keywords: str) -> list:
+    """Împarte șirul de keywords separat prin virgulă (fără elemente goale)."""
+    return [k.strip() for k in keywords.split(",") if k.strip()]
+
+
+def keywords_from_meta(meta: dict) -> list:
+    """Extrage cuvintele cheie dintr-un dict exiftool (cu sau fără grupuri)."""
+    found = []
+    for key, value in meta.items():
+        tag = key.split(":", 1)[1] if ":" in key else key
+        if tag not in KEYWORD_TAGS or value in (None, ""):
+            continue
+        values = value if isinstance(value, list) else split_keywords(str(value))
+        found.extend(str(v).strip() for v in values if str(v).strip())
+    return found
+
+
+class KeywordVocabulary:
+    """Vocabular de cuvinte cheie cu index de prefix pentru autocomplete.
+
+    Fiecare cuvânt este indexat după forma normalizată (fără diacritice), deci
+    „faianta” și „faianță” sunt aceeași intrare; păstrăm grafia cea mai des
+    întâlnită. Indexul este o listă sortată de chei normalizate în care
+    căutarea unui prefix se face prin bisecție (O(log n)); cheile noi sunt
+    inserate direct la locul lor, fără resortarea listei.
+
+    Cuvintele unui fișier sunt numărate o singură dată pentru fiecare versiune
+    a lui (cale, mărime, mtime), deci redeschiderea aceluiași fișier nu
+    schimbă grafia preferată. Sunt ținute minte cel mult MAX_TRACKED_FILES
+    fișiere, iar cele din directorul temporar (ex: încărcările Streamlit) nu
+    sunt salvate pe disc, pentru că nu vor mai fi redeschise.
+
+    Același obiect poate fi folosit din mai multe thread-uri (ex: sesiunile
+    Streamlit care împart `st.cache_resource`).
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        # cheie normalizată -> {grafie: număr de apariții}
+        self._spellings = {}
+        self._sorted_keys = []
+        # cale absolută -> [mărime, mtime_ns] a versiunii deja numărate
+        self._files = {}
+        self._changed = False
+        self._lock = threading.Lock()
+        # serializează salvările, ca o copie mai veche să nu o înlocuiască pe una nouă
+        self._save_lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                self.load()
+            except (OSError, ValueError):
+                # un vocabular corupt nu trebuie să blocheze editorul
+                self._spellings = {}
+                self._sorted_keys = []
+                self._files = {}
+
+    def __len__(self):
+        return len(self._spellings)
+
+    def _add_unlocked(self, keyword: str, count: int, index: bool = True):
+        keyword = " ".join(keyword.split())
+        norm = normalize_keyword(keyword)
+        if not norm:
+            return
+        spellings = self._spellings.get(norm)
+        if spellings is None:
+            spellings = self._spellings[norm] = {}
+            if index:
+                insort(self._sorted_keys, norm)
+        spellings[keyword] = spellings.get(keyword, 0) + count
+        self._changed = True
+
+    def add(self, keyword: str, count: int = 1):
+        with self._lock:
+            self._add_unlocked(keyword, count)
+
+    def add_many(self, keywords):
+        with self._lock:
+            for kw in keywords:
+                self._add_unlocked(kw, 1)
+
+    def add_from_file(self, filepath: str, meta: dict):
+        """Adaugă cuvintele cheie ale unui fișier citit (o dată per versiune a fișierului)."""
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return
+        key = os.path.abspath(filepath)
+        identity = [st.st_size, st.st_mtime_ns]
+        with self._lock:
+            if self._files.get(key) == identity:
+                return
+            # reinserat la final: la depășirea limitei sunt uitate cele mai vechi
+            self._files.pop(key, None)
+            self._files[key] = identity
+            while len(self._files) > MAX_TRACKED_FILES:
+                del self._files[next(iter(self._files))]
+            self._changed = True
+            for kw in keywords_from_meta(meta):
+                self._add_unlocked(kw, 1)
+
+    @staticmethod
+    def _preferred(spellings: dict) -> str:
+        return max(spellings.items(), key=lambda item: (item[1], item[0]))[0]
+
+    def suggest(self, prefix: str, limit: int = 10) -> list:
+        """Primele `limit` cuvinte (grafia preferată) care încep cu prefixul dat."""
+        norm = normalize_keyword(prefix)
+        if not norm:
+            return []
+        with self._lock:
+            keys = self._sorted_keys
+            result = []
+            i = bisect_left(keys, norm)
+            while i < len(keys) and len(result) < limit and keys[i].startswith(norm):
+                result.append(self._preferred(self._spellings[keys[i]]))
+                i += 1
+            return result
+
+    def load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            for keyword, count in data.get("keywords", {}).items():
+                self._add_unlocked(keyword, int(count), index=False)
+            # la încărcare sortăm o singură dată, nu inserăm cheie cu cheie
+            self._sorted_keys = sorted(self._spellings)
+            self._files = dict(data.get("files", {}))
+            self._changed = False
+
+    def save(self):
+        """Scrie vocabularul pe disc (doar dacă s-a modificat).
+
+        Dacă scrierea eșuează (OSError), vocabularul rămâne marcat ca modificat.
+        """
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._changed:
+                    return
+                keywords = {}
+                for spellings in self._spellings.values():
+                    keywords.update(spellings)
+                temp_dir = os.path.join(os.path.abspath(tempfile.gettempdir()), "")
+                files = {
+                    path: identity
+                    for path, identity in self._files.items()
+                    if not path.startswith(temp_dir)
+                }
+                data = {"keywords": keywords, "files": files}
+                # modificările făcute în timpul scrierii o marchează din nou
+                self._changed = False
+            tmp_path = None
+            try:
+                directory = os.path.dirname(self.path) or "."
+                os.makedirs(directory, exist_ok=True)
+                # fișier temporar unic, ca scrierile din alte procese să nu se amestece
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                with open(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                with self._lock:
+                    self._changed = True
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+
+def complete_last_keyword(keywords: str, suggestion: str) -> str:
+    """Înlocuiește ultimul cuvânt (cel în curs de tastare) cu sugestia aleasă."""
+    head, sep, _ = keywords.rpartition(",")
+    prefix = head + sep + " " if sep else ""
+    return prefix + suggestion + ", "
+
+
+def current_keyword_prefix(keywords: str) -> str:
+    """Returnează cuvântul în curs de tastare (după ultima virgulă)."""
+    return keywords.rpartition(",")[2].strip()
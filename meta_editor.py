@@ -1,23 +1,52 @@
 import subprocess
 import json
 import os
+import threading
 from datetime import datetime
 
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinter import scrolledtext
 
+from keyword_vocab import (
+    DEFAULT_VOCAB_PATH,
+    KeywordVocabulary,
+    complete_last_keyword,
+    current_keyword_prefix,
+    split_keywords,
+)
+from metadata_io import IMAGE_EXTENSIONS
+from previews import get_previews
+from undo_journal import find_entry, record_snapshot, restore_entry
+
+try:
+    from PIL import Image, ImageTk
+except ImportError:  # fără Pillow afișăm doar numele fișierelor
+    Image = ImageTk = None
+
+# dimensiunea unei poziții din banda de previzualizări
+THUMB_SLOT = 120
+THUMB_SIZE = (100, 90)
+
 
 class MetaEditorApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Image Metadata Editor")
-        self.root.geometry("900x750")
-        self.root.minsize(800, 650)
+        self.root.geometry("900x900")
+        self.root.minsize(800, 800)
         self.root.resizable(True, True)
 
         self.selected_files = []
         self.current_meta = {}
+        self.keyword_vocab = KeywordVocabulary(DEFAULT_VOCAB_PATH)
+        self.preview_images = {}
+        self.preview_index = {}
+        self._preview_job = None
+        # extragerea rulează într-un thread; rezultatele vechi (altă selecție) se ignoră
+        self._preview_generation = 0
+        self._preview_loading = False
+        self._preview_reload = False
 
         # ---- FRAME FIȘIERE ----
         files_frame = tk.LabelFrame(root, text="Fișiere imagine", padx=10, pady=10)
@@ -33,6 +62,17 @@ class MetaEditorApp:
                                command=self.select_files)
         select_btn.pack(pady=5)
 
+        # Previzualizări – se încarcă doar miniaturile vizibile
+        self.preview_canvas = tk.Canvas(files_frame, height=THUMB_SLOT, highlightthickness=0)
+        self.preview_scroll = tk.Scrollbar(
+            files_frame, orient="horizontal", command=self.preview_canvas.xview
+        )
+        self.preview_canvas.configure(xscrollcommand=self.on_preview_scroll)
+        self.preview_canvas.pack(fill="x")
+        self.preview_scroll.pack(fill="x")
+        self.preview_canvas.bind("<Configure>", lambda e: self.schedule_preview_load())
+        self.preview_canvas.bind("<Button-1>", self.on_preview_click)
+
         # ---- FRAME METADATA EDITABILE ----
         meta_frame = tk.LabelFrame(
             root,
@@ -70,6 +110,13 @@ class MetaEditorApp:
         ).grid(row=3, column=0, sticky="w")
         self.keywords_entry = tk.Entry(meta_frame, width=55)
         self.keywords_entry.grid(row=3, column=1, pady=2, sticky="w")
+        self.keywords_entry.bind("<KeyRelease>", self.update_keyword_suggestions)
+
+        # Sugestii keywords (din vocabularul construit din fișierele citite)
+        self.keyword_suggestions = tk.Listbox(meta_frame, height=4, width=28)
+        self.keyword_suggestions.grid(row=3, column=2, rowspan=2, padx=5, sticky="nw")
+        self.keyword_suggestions.bind("<Double-Button-1>", self.accept_keyword_suggestion)
+        self.keyword_suggestions.bind("<Return>", self.accept_keyword_suggestion)
 
         # Drepturi de autor
         tk.Label(
@@ -140,6 +187,15 @@ class MetaEditorApp:
         )
         clear_btn.pack(side="left", padx=(0, 10), ipady=6)
 
+        undo_btn = tk.Button(
+            btn_frame,
+            text="Anulează ultima scriere",
+            command=self.undo_last_write,
+            font=button_font,
+            width=22,
+        )
+        undo_btn.pack(side="left", padx=(0, 10), ipady=6)
+
         quit_btn = tk.Button(
             btn_frame,
             text="Închide",
@@ -156,7 +212,7 @@ class MetaEditorApp:
     # ---------- UTILITARE UI ----------
     def select_files(self):
         filetypes = [
-            ("Imagini", "*.jpg *.jpeg *.png *.tif *.tiff *.bmp *.gif *.heic *.webp"),
+            ("Imagini", " ".join(f"*.{ext}" for ext in IMAGE_EXTENSIONS)),
             ("Toate fișierele", "*.*"),
         ]
         files = filedialog.askopenfilenames(
@@ -167,15 +223,115 @@ class MetaEditorApp:
             self.selected_files = list(files)
             self.files_label.config(text=f"{len(self.selected_files)} fișier(e) selectat(e)")
             self.status_label.config(text="")
+            self.show_previews()
             # Încarcăm meta pentru primul fișier selectat
             self.load_metadata_for_file(self.selected_files[0])
         else:
             self.selected_files = []
+            self.show_previews()
             self.files_label.config(text="Niciun fișier selectat")
             self.current_file_label.config(text="Meta pentru: -")
             self.clear_fields()
             self.clear_meta_view()
 
+    # ---------- PREVIZUALIZĂRI ----------
+    def show_previews(self):
+        """Desenează câte o poziție goală pentru fiecare fișier selectat."""
+        self.preview_canvas.delete("all")
+        self.preview_images = {}
+        self._preview_generation += 1
+        self.preview_index = {p: i for i, p in enumerate(self.selected_files)}
+        for i, path in enumerate(self.selected_files):
+            x = i * THUMB_SLOT
+            self.preview_canvas.create_rectangle(
+                x + 5, 2, x + THUMB_SLOT - 5, THUMB_SIZE[1] + 4, outline="#cccccc"
+            )
+            self.preview_canvas.create_text(
+                x + THUMB_SLOT // 2,
+                THUMB_SIZE[1] + 15,
+                text=os.path.basename(path)[:16],
+                font=("Segoe UI", 8),
+            )
+        self.preview_canvas.configure(
+            scrollregion=(0, 0, len(self.selected_files) * THUMB_SLOT, THUMB_SLOT)
+        )
+        self.preview_canvas.xview_moveto(0)
+        self.schedule_preview_load()
+
+    def on_preview_scroll(self, first, last):
+        self.preview_scroll.set(first, last)
+        self.schedule_preview_load()
+
+    def schedule_preview_load(self):
+        if self._preview_job is None:
+            self._preview_job = self.root.after(50, self.load_visible_previews)
+
+    def load_visible_previews(self):
+        """Încarcă previzualizările doar pentru pozițiile vizibile (plus una în plus)."""
+        self._preview_job = None
+        if not self.selected_files:
+            return
+        if self._preview_loading:
+            # reluăm după ce se termină extragerea în curs
+            self._preview_reload = True
+            return
+        left = self.preview_canvas.canvasx(0)
+        right = left + self.preview_canvas.winfo_width()
+        first = max(int(left // THUMB_SLOT) - 1, 0)
+        last = min(int(right // THUMB_SLOT) + 2, len(self.selected_files))
+        pending = [
+            p for p in self.selected_files[first:last] if p not in self.preview_images
+        ]
+        if not pending:
+            return
+        for path in pending:
+            self.preview_images[path] = None
+        self._preview_loading = True
+        threading.Thread(
+            target=self._extract_previews,
+            args=(self._preview_generation, pending),
+            daemon=True,
+        ).start()
+
+    def _extract_previews(self, generation, pending):
+        """Rulează în thread: extrage previzualizările și le micșorează (fără Tk)."""
+        images = {}
+        try:
+            previews = get_previews(pending)
+        except OSError:
+            previews = {}
+        for path, cache_path in previews.items():
+            if not cache_path or Image is None:
+                continue
+            try:
+                with Image.open(cache_path) as img:
+                    img.thumbnail(THUMB_SIZE)
+                    images[path] = img.copy()
+            except OSError:
+                continue
+        try:
+            # PhotoImage se creează doar în thread-ul UI
+            self.root.after(0, self._show_extracted_previews, generation, images)
+        except (RuntimeError, tk.TclError):
+            pass  # fereastra a fost închisă între timp
+
+    def _show_extracted_previews(self, generation, images):
+        self._preview_loading = False
+        if generation == self._preview_generation and ImageTk is not None:
+            for path, img in images.items():
+                photo = ImageTk.PhotoImage(img)
+                self.preview_images[path] = photo
+                x = self.preview_index[path] * THUMB_SLOT + THUMB_SLOT // 2
+                self.preview_canvas.create_image(x, THUMB_SIZE[1] // 2 + 3, image=photo)
+        if self._preview_reload or generation != self._preview_generation:
+            self._preview_reload = False
+            self.schedule_preview_load()
+
+    def on_preview_click(self, event):
+        i = int(self.preview_canvas.canvasx(event.x) // THUMB_SLOT)
+        if 0 <= i < len(self.selected_files):
+            self.load_metadata_for_file(self.selected_files[i])
+
     def clear_fields(self):
         self.title_entry.delete(0, tk.END)
         self.author_entry.delete(0, tk.END)
@@ -200,6 +356,29 @@ class MetaEditorApp:
         self.date_entry.delete(0, tk.END)
         self.date_entry.insert(0, now_str)
 
+    def update_keyword_suggestions(self, event=None):
+        """Actualizează lista de sugestii pentru cuvântul în curs de tastare."""
+        if event is not None and event.keysym == "Down" and self.keyword_suggestions.size():
+            self.keyword_suggestions.focus_set()
+            self.keyword_suggestions.selection_set(0)
+            return
+        prefix = current_keyword_prefix(self.keywords_entry.get())
+        self.keyword_suggestions.delete(0, tk.END)
+        for kw in self.keyword_vocab.suggest(prefix):
+            self.keyword_suggestions.insert(tk.END, kw)
+
+    def accept_keyword_suggestion(self, event=None):
+        selection = self.keyword_suggestions.curselection()
+        if not selection:
+            return
+        suggestion = self.keyword_suggestions.get(selection[0])
+        new_value = complete_last_keyword(self.keywords_entry.get(), suggestion)
+        self.keywords_entry.delete(0, tk.END)
+        self.keywords_entry.insert(0, new_value)
+        self.keyword_suggestions.delete(0, tk.END)
+        self.keywords_entry.focus_set()
+        self.keywords_entry.icursor(tk.END)
+
     # ---------- CITIRE META ----------
     def load_metadata_for_file(self, filepath):
         """Citește meta datele complete pentru un fișier și actualizează UI-ul."""
@@ -238,6 +417,7 @@ class MetaEditorApp:
 
         meta = data[0]
         self.current_meta = meta
+        self.keyword_vocab.add_from_file(filepath, meta)
         filename = os.path.basename(filepath)
         self.current_file_label.config(text=f"Meta pentru: {filename}")
 
@@ -339,7 +519,7 @@ class MetaEditorApp:
         if keywords:
             # golim mai întâi keywords, apoi adăugăm
             cmd.append("-Keywords=")
-            for kw in [k.strip() for k in keywords.split(",") if k.strip()]:
+            for kw in split_keywords(keywords):
                 cmd.append(f"-Keywords={kw}")
 
         # Copyright
@@ -399,6 +579,8 @@ class MetaEditorApp:
         cmd.extend(self.selected_files)
 
         try:
+            # Salvăm în jurnal valorile vechi ale tag-urilor modificate (pentru anulare)
+            record_snapshot(self.selected_files, cmd[1:])
             result = subprocess.run(
                 cmd,
                 stdout=subprocess.PIPE,
@@ -413,6 +595,12 @@ class MetaEditorApp:
                 "sau că fișierul exiftool.exe este în același folder cu acest script.",
             )
             return
+        except (RuntimeError, ValueError) as e:
+            messagebox.showerror(
+                "Eroare",
+                f"Nu am putut salva valorile vechi pentru anulare, nu am scris nimic:\n{e}",
+            )
+            return
 
         if result.returncode == 0:
             messagebox.showinfo(
@@ -420,6 +608,14 @@ class MetaEditorApp:
                 "Meta datele au fost actualizate cu succes pentru toate fișierele selectate.",
             )
             self.status_label.config(text="Meta date scrise cu succes.")
+            if keywords:
+                self.keyword_vocab.add_many(split_keywords(keywords))
+                try:
+                    self.keyword_vocab.save()
+                except OSError as e:
+                    self.status_label.config(
+                        text=f"Meta date scrise, dar vocabularul de keywords nu a fost salvat: {e}"
+                    )
         else:
             messagebox.showerror(
                 "Eroare la exiftool", result.stderr or "Eroare necunoscută."
@@ -429,7 +625,41 @@ class MetaEditorApp:
             )
 
 
+    # ---------- ANULARE ----------
+    def undo_last_write(self):
+        """Reface valorile dinaintea ultimei scrieri în fișierele selectate."""
+        entry = find_entry(filepaths=self.selected_files) if self.selected_files else None
+        if entry is None:
+            messagebox.showinfo(
+                "Anulare", "Nu există nicio scriere de anulat pentru fișierele selectate."
+            )
+            return
+        if not messagebox.askyesno(
+            "Anulare",
+            f"Refac valorile pentru {len(entry['files'])} fișier(e) "
+            f"({', '.join(entry['tags'])}) de la {entry['time']}?",
+        ):
+            return
+        try:
+            restore_entry(entry)
+        except FileNotFoundError:
+            messagebox.showerror(
+                "Eroare",
+                "Nu am găsit 'exiftool'.\n"
+                "Asigură-te că este instalat și adăugat în PATH\n"
+                "sau că fișierul exiftool.exe este în același folder cu acest script.",
+            )
+            return
+        except RuntimeError as e:
+            messagebox.showerror("Eroare la anulare", str(e))
+            return
+        self.load_metadata_for_file(self.selected_files[0])
+        self.status_label.config(text="Ultima scriere a fost anulată.")
+
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = MetaEditorApp(root)
     root.mainloop()
+    # vocabularul se salvează după scrieri și la închiderea aplicației
+    app.keyword_vocab.save()
@@ -0,0 +1,107 @@
+import html
+import json
+import os
+import subprocess
+
+# Extensiile acceptate de selectorul de fișiere / uploader
+IMAGE_EXTENSIONS = ("jpg", "jpeg", "png", "tif", "tiff", "bmp", "gif", "heic", "webp")
+
+DEFAULT_BATCH_SIZE = 200
+
+# Director comun pentru datele persistente ale aplicației (vocabular, cache, jurnal)
+APP_DATA_DIR = os.path.join(os.path.expanduser("~"), ".meta_image")
+
+
+def is_image_file(filename: str) -> bool:
+    return filename.rpartition(".")[2].lower() in IMAGE_EXTENSIONS
+
+
+def split_tag_key(key: str):
+    """Împarte o cheie `Grup:Tag` în (grup, tag); grupul poate lipsi (None)."""
+    if ":" in key:
+        group, tag = key.split(":", 1)
+        return group.strip(), tag.strip()
+    return None, key.strip()
+
+
+def same_file_key(path: str) -> str:
+    """Cheie de comparație pentru căi (exiftool poate rescrie `\\` în `/` în SourceFile)."""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def missing_files(filepaths, metas) -> list:
+    """Fișierele din `filepaths` pe care exiftool le-a omis din rezultat (necitite)."""
+    read = {same_file_key(meta.get("SourceFile", "")) for meta in metas}
+    return [path for path in filepaths if same_file_key(path) not in read]
+
+
+def escape_value(value) -> str:
+    """Valoare de scris printr-un argfile (`-@`), pentru exiftool pornit cu `-E`.
+
+    Cu -E, exiftool decodează entitățile HTML, deci valoarea poate conține și
+    linii noi fără să fie împărțită în mai multe argumente.
+    """
+    text = html.escape(str(value), quote=False)
+    return text.replace("\r", "&#xd;").replace("\n", "&#xa;")
+
+
+def read_metadata_batch(filepaths, tags=None, extra_args=None) -> list:
+    """Citește meta datele (`-G1`) pentru mai multe fișiere într-un singur apel exiftool.
+
+    Lista de fișiere este trimisă prin stdin (`-@ -`), deci nu depinde de
+    limita de lungime a liniei de comandă. `tags` restrânge citirea la tag-urile
+    date (ex: `IPTC:Keywords`, `Title`); `extra_args` sunt opțiuni exiftool în
+    plus (ex: `["-a", "-n"]`).
+    """
+    filepaths = list(filepaths)
+    if not filepaths:
+        return []
+    cmd = ["exiftool", "-G1", "-j", "-charset", "filename=utf8"]
+    cmd += list(extra_args or [])
+    cmd += [f"-{tag}" for tag in tags or []]
+    cmd += ["-@", "-"]
+    result = subprocess.run(
+        cmd,
+        input="\n".join(filepaths) + "\n",
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+    )
+    # exiftool iese cu cod de eroare și când doar unele fișiere nu pot fi citite
+    if not result.stdout.strip():
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr or "Eroare necunoscută la exiftool")
+        return []
+    return json.loads(result.stdout)
+
+
+def iter_batches(items, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Grupează un iterabil în liste de cel mult `batch_size` elemente."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_image_files(paths, recursive: bool = True):
+    """Fișierele imagine din lista dată (directoarele sunt parcurse)."""
+    for path in paths:
+        if os.path.isdir(path):
+            if recursive:
+                for dirpath, dirnames, filenames in os.walk(path):
+                    dirnames.sort()
+                    for name in sorted(filenames):
+                        if is_image_file(name):
+                            yield os.path.join(dirpath, name)
+            else:
+                for name in sorted(os.listdir(path)):
+                    full = os.path.join(path, name)
+                    if os.path.isfile(full) and is_image_file(name):
+                        yield full
+        else:
+            yield path
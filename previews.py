@@ -0,0 +1,105 @@
+import base64
+import hashlib
+import io
+import os
+import tempfile
+
+from metadata_io import APP_DATA_DIR, read_metadata_batch, split_tag_key
+
+DEFAULT_PREVIEW_DIR = os.path.join(APP_DATA_DIR, "previews")
+PREVIEW_SIZE = (256, 256)
+
+# Tag-urile cu imagini încorporate, în ordinea preferinței
+EMBEDDED_PREVIEW_TAGS = ["ThumbnailImage", "PreviewImage"]
+
+
+def preview_cache_path(filepath: str, cache_dir: str = DEFAULT_PREVIEW_DIR) -> str:
+    """Calea din cache pentru un fișier, după identitatea lui (cale, mărime, mtime)."""
+    st = os.stat(filepath)
+    identity = f"{os.path.abspath(filepath)}|{st.st_size}|{st.st_mtime_ns}"
+    digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, digest[:2], digest + ".jpg")
+
+
+def extract_embedded_previews(filepaths) -> dict:
+    """Extrage într-un singur apel exiftool imaginile încorporate (bytes sau None)."""
+    if not filepaths:
+        return {}
+    previews = {p: None for p in filepaths}
+    try:
+        data = read_metadata_batch(filepaths, EMBEDDED_PREVIEW_TAGS, extra_args=["-b"])
+    except (RuntimeError, ValueError):
+        return previews
+    by_source = {os.path.normcase(os.path.abspath(p)): p for p in filepaths}
+    for item in data:
+        path = by_source.get(os.path.normcase(os.path.abspath(item.get("SourceFile", ""))))
+        if path is None:
+            continue
+        # cheile sunt `Grup:Tag` (ex: `IFD1:ThumbnailImage`)
+        found = {split_tag_key(key)[1]: value for key, value in item.items()}
+        for tag in EMBEDDED_PREVIEW_TAGS:
+            value = found.get(tag)
+            if isinstance(value, str) and value.startswith("base64:"):
+                previews[path] = base64.b64decode(value[len("base64:"):])
+                break
+    return previews
+
+
+def decode_preview(filepath: str, size=PREVIEW_SIZE):
+    """Fallback: decodează imaginea redusă cu Pillow (None dacă nu se poate)."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(filepath) as img:
+            # pentru JPEG, draft() decodează direct la o rezoluție redusă
+            img.draft("RGB", size)
+            img.thumbnail(size)
+            buf = io.BytesIO()
+            img.convert("RGB").save(buf, format="JPEG", quality=85)
+            return buf.getvalue()
+    except Exception:
+        return None
+
+
+def get_previews(filepaths, cache_dir: str = DEFAULT_PREVIEW_DIR) -> dict:
+    """Returnează {cale: fișier preview din cache sau None} pentru fișierele date.
+
+    Fișierele deja în cache nu mai sunt citite deloc; pentru restul se face un
+    singur apel exiftool, iar decodarea completă se folosește doar pentru
+    fișierele fără imagine încorporată.
+    """
+    result = {}
+    missing = {}
+    for path in filepaths:
+        try:
+            cache_path = preview_cache_path(path, cache_dir)
+        except OSError:
+            result[path] = None
+            continue
+        if os.path.exists(cache_path):
+            result[path] = cache_path
+        else:
+            missing[path] = cache_path
+
+    if missing:
+        try:
+            embedded = extract_embedded_previews(list(missing))
+        except FileNotFoundError:
+            # fără exiftool rămâne doar decodarea cu Pillow
+            embedded = {}
+        for path, cache_path in missing.items():
+            data = embedded.get(path) or decode_preview(path)
+            if not data:
+                result[path] = None
+                continue
+            cache_subdir = os.path.dirname(cache_path)
+            os.makedirs(cache_subdir, exist_ok=True)
+            # scriem întâi într-un fișier temporar: în cache apar doar previzualizări complete
+            fd, tmp_path = tempfile.mkstemp(dir=cache_subdir, suffix=".tmp")
+            with open(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, cache_path)
+            result[path] = cache_path
+    return result
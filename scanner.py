@@ -0,0 +1,289 @@
+"""Scanare paralelă a unei biblioteci de imagini, cu citirea meta datelor.
+
+Exemple:
+    python scanner.py D:/Poze --index scan_index.jsonl
+    python scanner.py //nas/poze --index scan_index.jsonl --output modificate.jsonl --readers 8
+
+Directoarele sunt parcurse cu `os.scandir` în mai multe procese; fiecare
+proces primește un subarbore și îl parcurge până la un număr maxim de intrări,
+după care returnează directoarele rămase pentru a fi împărțite între procese.
+
+Cu `--index`, fișierele cu aceeași mărime și același mtime ca la scanarea
+anterioară nu mai sunt citite. Restul sunt trimise în loturi la mai multe
+procese exiftool în paralel; mărimea lotului se ajustează după durata
+loturilor deja citite.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from metadata_io import is_image_file, missing_files, read_metadata_batch
+
+DEFAULT_WALKERS = min(8, os.cpu_count() or 1)
+DEFAULT_READERS = min(8, os.cpu_count() or 1)
+# câte intrări parcurge un proces înainte de a împărți directoarele rămase
+WALK_BUDGET = 5000
+# limitele loturilor de citire și durata țintă a unui lot (secunde)
+MIN_BATCH = 16
+MAX_BATCH = 1000
+TARGET_BATCH_SECONDS = 2.0
+
+
+def _walk_subtree(root: str, budget: int = WALK_BUDGET):
+    """Rulează într-un proces separat: parcurge un subarbore (cel mult `budget` intrări).
+
+    Returnează (fișiere imagine ca (cale, mărime, mtime_ns), directoare neparcurse).
+    """
+    files = []
+    stack = [root]
+    entries = 0
+    while stack and entries < budget:
+        path = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    entries += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif is_image_file(entry.name) and entry.is_file():
+                            st = entry.stat()
+                            files.append((entry.path, st.st_size, st.st_mtime_ns))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return files, stack
+
+
+def load_index(path: str) -> dict:
+    """Indexul unei scanări anterioare: {cale: (mărime, mtime_ns)}."""
+    index = {}
+    if not path or not os.path.exists(path):
+        return index
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                filepath, size, mtime_ns = json.loads(line)
+                index[filepath] = (size, mtime_ns)
+    return index
+
+
+def save_index(path: str, index: dict):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        for filepath, (size, mtime_ns) in index.items():
+            f.write(json.dumps([filepath, size, mtime_ns], ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+
+
+class _AdaptiveBatchSize:
+    """Mărimea lotului, ajustată astfel încât un lot să dureze ~TARGET_BATCH_SECONDS."""
+
+    def __init__(self):
+        self.size = MIN_BATCH
+
+    def update(self, count: int, elapsed: float):
+        if count <= 0 or elapsed <= 0:
+            return
+        wanted = int(TARGET_BATCH_SECONDS * count / elapsed)
+        # creștem treptat, ca un lot lent să nu producă loturi uriașe
+        self.size = max(MIN_BATCH, min(MAX_BATCH, wanted, self.size * 2))
+
+
+class LibraryScanner:
+    """Descoperă imaginile din `roots` și citește meta datele celor noi/modificate."""
+
+    def __init__(
+        self,
+        roots,
+        previous_index: dict = None,
+        tags=None,
+        walkers: int = DEFAULT_WALKERS,
+        readers: int = DEFAULT_READERS,
+    ):
+        self.roots = list(roots)
+        self.previous_index = previous_index or {}
+        self.tags = tags
+        self.walkers = walkers
+        self.readers = readers
+        # indexul scanării curente (doar fișierele văzute și citite cu succes)
+        self.index = {}
+        self.seen = 0
+        self.unchanged = 0
+        self.errors = []
+
+    def iter_files(self):
+        """Toate fișierele imagine, ca (cale, mărime, mtime_ns), în ordinea descoperirii."""
+        dirs = []
+        for root in self.roots:
+            if os.path.isdir(root):
+                dirs.append(root)
+            elif os.path.isfile(root):
+                st = os.stat(root)
+                yield root, st.st_size, st.st_mtime_ns
+        if not dirs:
+            return
+        with ProcessPoolExecutor(self.walkers) as pool:
+            pending = {pool.submit(_walk_subtree, d) for d in dirs}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, remaining = future.result()
+                    for d in remaining:
+                        pending.add(pool.submit(_walk_subtree, d))
+                    yield from files
+
+    def iter_changed(self):
+        """Fișierele noi sau modificate față de indexul anterior."""
+        for path, size, mtime_ns in self.iter_files():
+            self.seen += 1
+            if self.previous_index.get(path) == (size, mtime_ns):
+                self.unchanged += 1
+                self.index[path] = (size, mtime_ns)
+                continue
+            yield path, size, mtime_ns
+
+    def _under_roots(self, path: str) -> bool:
+        path = os.path.normcase(os.path.normpath(path))
+        for root in self.roots:
+            root = os.path.normcase(os.path.normpath(root))
+            if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+                return True
+        return False
+
+    def removed(self) -> list:
+        """Fișierele de sub `roots` din indexul anterior care nu mai există (după scanare)."""
+        failed = {path for batch, _ in self.errors for path, _, _ in batch}
+        return [
+            p
+            for p in self.previous_index
+            if p not in self.index and p not in failed and self._under_roots(p)
+        ]
+
+    def merged_index(self) -> dict:
+        """Indexul anterior actualizat cu scanarea curentă.
+
+        Intrările din afara `roots` rămân neschimbate; cele din loturile cu
+        erori își păstrează valoarea veche, ca să fie citite din nou data viitoare.
+        """
+        index = dict(self.previous_index)
+        for path in self.removed():
+            del index[path]
+        index.update(self.index)
+        return index
+
+    def _read_batch(self, batch):
+        start = time.perf_counter()
+        metas = read_metadata_batch([path for path, _, _ in batch], self.tags)
+        return metas, time.perf_counter() - start
+
+    def iter_metadata_batches(self):
+        """Listele de meta date ale fișierelor modificate, pe măsură ce sunt citite.
+
+        Loturile sunt citite în paralel, deci ordinea nu este cea a descoperirii.
+        """
+        batch_size = _AdaptiveBatchSize()
+        max_in_flight = self.readers * 2
+        with ThreadPoolExecutor(self.readers) as pool:
+            in_flight = {}
+
+            def collect():
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = in_flight.pop(future)
+                    try:
+                        metas, elapsed = future.result()
+                    except (RuntimeError, ValueError) as e:
+                        self.errors.append((batch, str(e)))
+                        continue
+                    batch_size.update(len(batch), elapsed)
+                    # fișierele omise de exiftool nu intră în index, ca să fie citite din nou
+                    missing = set(missing_files([path for path, _, _ in batch], metas))
+                    if missing:
+                        unread = [item for item in batch if item[0] in missing]
+                        self.errors.append((unread, "fișierele nu au putut fi citite"))
+                    for path, size, mtime_ns in batch:
+                        if path not in missing:
+                            self.index[path] = (size, mtime_ns)
+                    yield metas
+
+            batch = []
+            for item in self.iter_changed():
+                batch.append(item)
+                if len(batch) < batch_size.size:
+                    continue
+                in_flight[pool.submit(self._read_batch, batch)] = batch
+                batch = []
+                if len(in_flight) >= max_in_flight:
+                    yield from collect()
+            if batch:
+                in_flight[pool.submit(self._read_batch, batch)] = batch
+            while in_flight:
+                yield from collect()
+
+
+def main(argv=None):
+    from export_meta import FORMATS, WRITERS
+
+    parser = argparse.ArgumentParser(
+        description="Scanează în paralel directoare de imagini și citește meta datele."
+    )
+    parser.add_argument("roots", nargs="+", help="Directoare (sau fișiere) de scanat")
+    parser.add_argument("--index", help="Indexul scanării (citit și actualizat, .jsonl)")
+    parser.add_argument("--output", help="Exportă meta datele fișierelor noi/modificate")
+    parser.add_argument("--format", choices=FORMATS, help="Formatul exportului")
+    parser.add_argument("--tags", nargs="+", metavar="GRUP:TAG", help="Citește doar aceste tag-uri")
+    parser.add_argument("--walkers", type=int, default=DEFAULT_WALKERS)
+    parser.add_argument("--readers", type=int, default=DEFAULT_READERS)
+    args = parser.parse_args(argv)
+
+    scanner = LibraryScanner(
+        args.roots,
+        previous_index=load_index(args.index),
+        tags=args.tags,
+        walkers=args.walkers,
+        readers=args.readers,
+    )
+
+    writer = None
+    if args.output:
+        fmt = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+        if fmt not in WRITERS:
+            parser.exit(1, f"Format necunoscut: {fmt!r}\n")
+        writer = WRITERS[fmt](args.output, args.tags)
+
+    read = 0
+    try:
+        for metas in scanner.iter_metadata_batches():
+            read += len(metas)
+            if writer:
+                writer.write_batch(metas)
+            print(
+                f"\r{scanner.seen} fișier(e) găsite, {read} citite", end="", file=sys.stderr, flush=True
+            )
+    except FileNotFoundError:
+        parser.exit(1, "\nNu am găsit 'exiftool'. Asigură-te că este instalat și în PATH.\n")
+    finally:
+        if writer:
+            writer.close()
+
+    if args.index:
+        save_index(args.index, scanner.merged_index())
+    print(
+        f"\r{scanner.seen} fișier(e) găsite: {scanner.unchanged} nemodificate, "
+        f"{read} citite, {len(scanner.removed())} șterse, {len(scanner.errors)} lot(uri) cu erori",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,22 @@ import os
 import tempfile
 from datetime import datetime
 import mimetypes
+import atexit
+
+from keyword_vocab import (
+    DEFAULT_VOCAB_PATH,
+    KeywordVocabulary,
+    complete_last_keyword,
+    current_keyword_prefix,
+    split_keywords,
+)
+from metadata_io import IMAGE_EXTENSIONS
+from previews import get_previews
+from undo_journal import find_entry, record_snapshot, restore_entry
+
+# câte previzualizări afișăm pe o pagină
+PREVIEW_PAGE_SIZE = 12
+PREVIEW_COLUMNS = 6
 
 # Grupe/tag-uri pe care nu are sens să încercăm să le scriem
 NON_WRITABLE_GROUPS = {"File", "System", "Composite"}
@@ -86,7 +102,7 @@ def build_exiftool_cmd_from_fields(
 
     if keywords:
         cmd.append("-Keywords=")  # golim mai întâi
-        for kw in [k.strip() for k in keywords.split(",") if k.strip()]:
+        for kw in split_keywords(keywords):
             cmd.append(f"-Keywords={kw}")
 
     if copyright_text:
@@ -137,60 +153,29 @@ def build_exiftool_cmd_from_fields(
     return cmd
 
 
-# ---------------------- UI STREAMLIT ----------------------
-
-st.set_page_config(page_title="Meta Image Editor", layout="wide")
-
-st.title("🖼️ Image Metadata Editor (Streamlit)")
-st.write(
-    "Încarcă una sau mai multe imagini, vezi meta datele și rescrie-le folosind ExifTool."
-)
+@st.cache_resource
+def get_keyword_vocab() -> KeywordVocabulary:
+    """Vocabularul de keywords, încărcat o singură dată per proces."""
+    vocab = KeywordVocabulary(DEFAULT_VOCAB_PATH)
+    # se salvează după scrieri și la oprirea serverului
+    atexit.register(vocab.save)
+    return vocab
 
-uploaded_files = st.file_uploader(
-    "Încarcă imagini",
-    type=["jpg", "jpeg", "png", "tif", "tiff", "bmp", "gif", "heic", "webp"],
-    accept_multiple_files=True,
-)
 
-if not uploaded_files:
-    st.info("Încarcă cel puțin o imagine pentru a începe.")
-    st.stop()
+@st.cache_data(show_spinner=False, max_entries=256)
+def read_metadata_cached(filepath: str, size: int, mtime_ns: int) -> dict:
+    """`read_metadata` cu cache după identitatea fișierului (cale, mărime, mtime)."""
+    return read_metadata(filepath)
 
-# director temporar în sesiune
-if "tempdir" not in st.session_state:
-    st.session_state["tempdir"] = tempfile.mkdtemp()
 
-tempdir = st.session_state["tempdir"]
+def load_current_meta(filepath: str) -> dict:
+    st_info = os.stat(filepath)
+    return read_metadata_cached(filepath, st_info.st_size, st_info.st_mtime_ns)
 
-# salvăm fișierele încărcate
-paths = []
-for uf in uploaded_files:
-    path = os.path.join(tempdir, uf.name)
-    with open(path, "wb") as f:
-        f.write(uf.read())
-    paths.append(path)
 
-# fișier curent pentru inspectarea meta datelor
-idx = 0
-if len(paths) > 1:
-    idx = st.selectbox(
-        "Alege fișier pentru vizualizarea meta datelor",
-        options=list(range(len(paths))),
-        format_func=lambda i: os.path.basename(paths[i]),
-    )
-
-current_path = paths[idx]
-st.write(f"**Fișier curent:** `{os.path.basename(current_path)}`")
-
-try:
-    meta = read_metadata(current_path)
-except Exception as e:
-    st.error(f"Eroare la citirea meta datelor cu exiftool: {e}")
-    st.stop()
-
-# inițializăm câmpurile când se schimbă fișierul curent
-if "current_file" not in st.session_state or st.session_state["current_file"] != current_path:
-    st.session_state["current_file"] = current_path
+def init_fields_from_meta(filepath: str, meta: dict):
+    """Completează câmpurile formularului și meta brută pentru fișierul curent."""
+    get_keyword_vocab().add_from_file(filepath, meta)
 
     title = find_first_tag(meta, ["Title", "ObjectName", "XPTitle"]) or ""
     author = find_first_tag(meta, ["Artist", "Creator", "XPAuthor"]) or ""
@@ -222,14 +207,58 @@ if "current_file" not in st.session_state or st.session_state["current_file"] !=
         lines.append(f"{tag} = {value}")
     st.session_state["raw_meta"] = "\n".join(lines)
 
+
 # callback pentru butonul „Data curentă”
 def set_current_date():
     st.session_state["date_original_input"] = datetime.now().strftime("%Y:%m:%d %H:%M:%S")
 
-# layout pe două coloane
-col1, col2 = st.columns([1, 1])
 
-with col1:
+# callback pentru sugestiile de keywords
+def accept_keyword_suggestion(suggestion: str):
+    st.session_state["keywords"] = complete_last_keyword(
+        st.session_state.get("keywords", ""), suggestion
+    )
+
+
+# ---------------------- FRAGMENTE ----------------------
+# Fiecare secțiune a paginii este un fragment: o modificare într-un câmp
+# rulează din nou doar fragmentul lui, nu și upload-ul, citirea meta datelor
+# sau celelalte secțiuni.
+
+
+@st.fragment
+def file_selection_fragment(paths: list, current_idx: int):
+    # previzualizări: încărcăm doar pagina afișată
+    with st.expander("Previzualizare imagini", expanded=True):
+        n_pages = (len(paths) + PREVIEW_PAGE_SIZE - 1) // PREVIEW_PAGE_SIZE
+        page = 1
+        if n_pages > 1:
+            page = st.number_input("Pagina", min_value=1, max_value=n_pages, value=1, step=1)
+        page_paths = paths[(page - 1) * PREVIEW_PAGE_SIZE : page * PREVIEW_PAGE_SIZE]
+        page_previews = get_previews(page_paths)
+        preview_cols = st.columns(PREVIEW_COLUMNS)
+        for i, p in enumerate(page_paths):
+            with preview_cols[i % PREVIEW_COLUMNS]:
+                if page_previews.get(p):
+                    st.image(page_previews[p], caption=os.path.basename(p))
+                else:
+                    st.caption(f"{os.path.basename(p)} (fără previzualizare)")
+
+    # fișier curent pentru inspectarea meta datelor
+    if len(paths) > 1:
+        idx = st.selectbox(
+            "Alege fișier pentru vizualizarea meta datelor",
+            options=list(range(len(paths))),
+            format_func=lambda i: os.path.basename(paths[i]),
+            key="current_idx",
+        )
+        if idx != current_idx:
+            # alt fișier: formularul și meta brută trebuie reîncărcate
+            st.rerun()
+
+
+@st.fragment
+def standard_form_fragment():
     st.subheader("Meta standard (se aplică la toate fișierele încărcate)")
 
     st.text_input(
@@ -251,6 +280,19 @@ with col1:
         "Keywords (separate prin virgulă, ex: „gresie, faianta, parchet, baie”)",
         key="keywords",
     )
+    suggestions = get_keyword_vocab().suggest(
+        current_keyword_prefix(st.session_state.get("keywords", "")), limit=6
+    )
+    if suggestions:
+        sugg_cols = st.columns(len(suggestions))
+        for i, (sugg_col, suggestion) in enumerate(zip(sugg_cols, suggestions)):
+            with sugg_col:
+                st.button(
+                    suggestion,
+                    key=f"kw_suggestion_{i}",
+                    on_click=accept_keyword_suggestion,
+                    args=(suggestion,),
+                )
 
     st.text_input(
         'Copyright (ex: "© 2025 CeraMall")',
@@ -266,7 +308,9 @@ with col1:
     with date_col2:
         st.button("Data curentă", on_click=set_current_date)
 
-with col2:
+
+@st.fragment
+def raw_editor_fragment():
     st.subheader("Meta completă (editabilă – avansat)")
     st.write(
         "Format: `Grup:Tag = valoare` (o meta pe linie). "
@@ -284,10 +328,38 @@ with col2:
         value=False,
     )
 
-st.markdown("---")
 
-# buton de scriere în fișiere
-if st.button("✏️ Scrie meta date în toate fișierele încărcate"):
+def undo_last_write(paths: list):
+    """Reface valorile dinaintea ultimei scrieri în fișierele încărcate."""
+    entry = find_entry(filepaths=paths)
+    if entry is None:
+        st.info("Nu există nicio scriere de anulat pentru fișierele încărcate.")
+        return
+    try:
+        restore_entry(entry)
+    except FileNotFoundError:
+        st.error("Nu am găsit `exiftool` în mediu.")
+        return
+    except RuntimeError as e:
+        st.error(f"Eroare la anulare:\n\n{e}")
+        return
+    # formularul și meta brută se reîncarcă din fișierul restaurat
+    st.session_state.pop("current_file", None)
+    st.rerun()
+
+
+@st.fragment
+def write_fragment(paths: list):
+    write_col, undo_col = st.columns([3, 1])
+    with undo_col:
+        if st.button("↩️ Anulează ultima scriere"):
+            undo_last_write(paths)
+    # buton de scriere în fișiere
+    with write_col:
+        write_clicked = st.button("✏️ Scrie meta date în toate fișierele încărcate")
+    if not write_clicked:
+        return
+
     title = st.session_state.get("title", "").strip()
     author = st.session_state.get("author", "").strip()
     desc = st.session_state.get("desc", "").strip()
@@ -305,7 +377,7 @@ if st.button("✏️ Scrie meta date în toate fișierele încărcate"):
             "Nu ai completat niciun câmp și nu ai bifat aplicarea meta-ului complet. "
             "Nu am ce să scriu în fișiere."
         )
-        st.stop()
+        return
 
     base_cmd = build_exiftool_cmd_from_fields(
         title,
@@ -320,13 +392,15 @@ if st.button("✏️ Scrie meta date în toate fișierele încărcate"):
 
     if not base_cmd:
         st.warning("Niciun tag de rescris. Verifică datele introduse.")
-        st.stop()
+        return
 
     cmd = ["exiftool"] + base_cmd + ["-overwrite_original"] + paths
 
     st.code(" ".join(cmd), language="bash")
 
     try:
+        # salvăm în jurnal valorile vechi ale tag-urilor modificate (pentru anulare)
+        record_snapshot(paths, base_cmd)
         result = subprocess.run(
             cmd,
             stdout=subprocess.PIPE,
@@ -338,7 +412,10 @@ if st.button("✏️ Scrie meta date în toate fișierele încărcate"):
             "Nu am găsit `exiftool` în mediu. "
             "Pe Streamlit Cloud ai nevoie de un fișier `packages.txt` cu o linie:\n\n`exiftool`"
         )
-        st.stop()
+        return
+    except (RuntimeError, ValueError) as e:
+        st.error(f"Nu am putut salva valorile vechi pentru anulare, nu am scris nimic:\n\n{e}")
+        return
 
     if result.returncode != 0:
         st.error(
@@ -347,6 +424,12 @@ if st.button("✏️ Scrie meta date în toate fișierele încărcate"):
         )
     else:
         st.success("Meta datele au fost actualizate cu succes pentru toate fișierele încărcate!")
+        if keywords:
+            get_keyword_vocab().add_many(split_keywords(keywords))
+            try:
+                get_keyword_vocab().save()
+            except OSError as e:
+                st.warning(f"Vocabularul de keywords nu a putut fi salvat: {e}")
 
         st.subheader("Descarcă fișierele modificate")
         for p in paths:
@@ -363,3 +446,76 @@ if st.button("✏️ Scrie meta date în toate fișierele încărcate"):
                 file_name=os.path.basename(p),
                 mime=mime,
             )
+
+
+# ---------------------- UI STREAMLIT ----------------------
+
+st.set_page_config(page_title="Meta Image Editor", layout="wide")
+
+st.title("🖼️ Image Metadata Editor (Streamlit)")
+st.write(
+    "Încarcă una sau mai multe imagini, vezi meta datele și rescrie-le folosind ExifTool."
+)
+
+uploaded_files = st.file_uploader(
+    "Încarcă imagini",
+    type=list(IMAGE_EXTENSIONS),
+    accept_multiple_files=True,
+)
+
+if not uploaded_files:
+    st.info("Încarcă cel puțin o imagine pentru a începe.")
+    st.stop()
+
+# director temporar în sesiune
+if "tempdir" not in st.session_state:
+    st.session_state["tempdir"] = tempfile.mkdtemp()
+
+tempdir = st.session_state["tempdir"]
+
+# salvăm fișierele încărcate (doar cele noi, ca fișierele să-și păstreze
+# identitatea între rulări și previzualizările din cache să rămână valide)
+written_uploads = st.session_state.setdefault("written_uploads", {})
+paths = []
+for uf in uploaded_files:
+    path = os.path.join(tempdir, uf.name)
+    upload_id = getattr(uf, "file_id", None) or (uf.name, uf.size)
+    if written_uploads.get(path) != upload_id or not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(uf.read())
+        written_uploads[path] = upload_id
+    paths.append(path)
+
+idx = st.session_state.get("current_idx", 0)
+if not 0 <= idx < len(paths):
+    idx = 0
+    st.session_state["current_idx"] = 0
+
+file_selection_fragment(paths, idx)
+
+current_path = paths[idx]
+st.write(f"**Fișier curent:** `{os.path.basename(current_path)}`")
+
+try:
+    meta = load_current_meta(current_path)
+except Exception as e:
+    st.error(f"Eroare la citirea meta datelor cu exiftool: {e}")
+    st.stop()
+
+# inițializăm câmpurile când se schimbă fișierul curent
+if "current_file" not in st.session_state or st.session_state["current_file"] != current_path:
+    st.session_state["current_file"] = current_path
+    init_fields_from_meta(current_path, meta)
+
+# layout pe două coloane
+col1, col2 = st.columns([1, 1])
+
+with col1:
+    standard_form_fragment()
+
+with col2:
+    raw_editor_fragment()
+
+st.markdown("---")
+
+write_fragment(paths)
@@ -0,0 +1,217 @@
+"""Jurnal de anulare pentru scrierile de meta date.
+
+Înainte de fiecare scriere se citesc (într-un singur apel exiftool) doar
+valorile tag-urilor care urmează să fie modificate, iar instantaneul este
+adăugat ca o linie JSON într-un singur fișier jurnal. Fișierele imagine nu
+sunt copiate, deci scrierile pot folosi în continuare `-overwrite_original`.
+
+Exemple:
+    python undo_journal.py list
+    python undo_journal.py restore            # anulează ultima scriere neanulată
+    python undo_journal.py restore 20251202T101500-3f2a
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import uuid
+from datetime import datetime
+
+from metadata_io import APP_DATA_DIR, escape_value, read_metadata_batch
+
+DEFAULT_JOURNAL_PATH = os.path.join(APP_DATA_DIR, "undo_journal.jsonl")
+
+
+def tags_from_args(tag_args) -> list:
+    """Tag-urile modificate de argumentele exiftool (ex: `-Title=x` -> `Title`)."""
+    tags = []
+    for arg in tag_args:
+        if not arg.startswith("-") or "=" not in arg:
+            continue
+        tag = arg[1:].split("=", 1)[0].rstrip("+-#").strip()
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def _same_file_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def take_snapshot(filepaths, tag_args, note: str = "", restores: str = None):
+    """Intrarea de jurnal cu valorile actuale ale tag-urilor pe care le va scrie `tag_args`.
+
+    `restores` este id-ul intrării pe care o anulează această scriere (dacă e cazul).
+    Returnează None dacă argumentele nu modifică niciun tag.
+    """
+    tags = tags_from_args(tag_args)
+    if not tags or not filepaths:
+        return None
+    filepaths = [os.path.abspath(p) for p in filepaths]
+    # -a: toate aparițiile tag-ului (din toate grupurile); -n: valori brute
+    metas = read_metadata_batch(filepaths, tags, extra_args=["-a", "-n"])
+    by_source = {_same_file_key(m.get("SourceFile", "")): m for m in metas}
+
+    files = {}
+    for path in filepaths:
+        meta = by_source.get(_same_file_key(path), {})
+        files[path] = {k: v for k, v in meta.items() if k != "SourceFile"}
+
+    now = datetime.now()
+    entry = {
+        "id": now.strftime("%Y%m%dT%H%M%S-") + uuid.uuid4().hex[:4],
+        "time": now.isoformat(timespec="seconds"),
+        "note": note,
+        "tags": tags,
+        "files": files,
+    }
+    if restores:
+        entry["restores"] = restores
+    return entry
+
+
+def append_entry(entry: dict, journal_path: str = DEFAULT_JOURNAL_PATH):
+    os.makedirs(os.path.dirname(journal_path) or ".", exist_ok=True)
+    with open(journal_path, "a", encoding="utf-8", newline="\n") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def record_snapshot(filepaths, tag_args, journal_path: str = DEFAULT_JOURNAL_PATH, note: str = ""):
+    """Salvează în jurnal valorile actuale ale tag-urilor pe care le va scrie `tag_args`.
+
+    Returnează id-ul intrării (sau None dacă argumentele nu modifică niciun tag).
+    """
+    entry = take_snapshot(filepaths, tag_args, note)
+    if entry is None:
+        return None
+    append_entry(entry, journal_path)
+    return entry["id"]
+
+
+def iter_entries(journal_path: str = DEFAULT_JOURNAL_PATH):
+    if not os.path.exists(journal_path):
+        return
+    with open(journal_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def restored_ids(journal_path: str = DEFAULT_JOURNAL_PATH) -> set:
+    """Id-urile intrărilor care au fost deja anulate."""
+    return {e["restores"] for e in iter_entries(journal_path) if e.get("restores")}
+
+
+def find_entry(entry_id: str = None, journal_path: str = DEFAULT_JOURNAL_PATH, filepaths=None):
+    """Intrarea cu id-ul dat sau, fără id, ultima scriere care nu a fost anulată.
+
+    Fără id, intrările create de restaurări și cele deja anulate sunt sărite,
+    deci anulări repetate merg tot mai în urmă. Cu `filepaths`, sunt luate în
+    considerare doar intrările care privesc exclusiv fișiere din această listă.
+    """
+    allowed = {_same_file_key(p) for p in filepaths} if filepaths is not None else None
+    candidates = []
+    restored = set()
+    for entry in iter_entries(journal_path):
+        if entry.get("restores"):
+            restored.add(entry["restores"])
+        if entry_id is not None:
+            if entry["id"] == entry_id:
+                return entry
+            continue
+        if entry.get("restores"):
+            continue
+        if allowed is not None and any(_same_file_key(p) not in allowed for p in entry["files"]):
+            continue
+        candidates.append(entry)
+    for entry in reversed(candidates):
+        if entry["id"] not in restored:
+            return entry
+    return None
+
+
+def restore_args(entry: dict) -> list:
+    """Argumentele exiftool (un singur argfile cu -execute) care refac intrarea."""
+    args = []
+    for path, values in entry["files"].items():
+        if not os.path.exists(path):
+            continue
+        args.append("-E")
+        # ștergem tag-ul din toate grupurile, apoi punem înapoi valorile vechi
+        args += [f"-{tag}=" for tag in entry["tags"]]
+        for key, value in values.items():
+            for item in value if isinstance(value, list) else [value]:
+                args.append(f"-{key}#={escape_value(item)}")
+        args += ["-overwrite_original", path, "-execute"]
+    return args
+
+
+def restore_entry(entry: dict, journal_path: str = DEFAULT_JOURNAL_PATH) -> str:
+    """Reface valorile din intrare pentru toate fișierele, într-un singur proces exiftool.
+
+    Starea de dinaintea restaurării este și ea salvată în jurnal, dar numai
+    după ce exiftool a reușit: altfel intrarea ar apărea anulată deși nu este.
+    """
+    paths = [p for p in entry["files"] if os.path.exists(p)]
+    if not paths:
+        raise RuntimeError("Niciunul dintre fișierele din această intrare nu mai există.")
+    snapshot = take_snapshot(
+        paths,
+        [f"-{tag}=" for tag in entry["tags"]],
+        note=f"restaurare {entry['id']}",
+        restores=entry["id"],
+    )
+    result = subprocess.run(
+        ["exiftool", "-@", "-", "-common_args", "-charset", "filename=utf8"],
+        input="\n".join(restore_args(entry)) + "\n",
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+    )
+    errors = [line for line in result.stderr.splitlines() if line.startswith("Error")]
+    if result.returncode != 0 or errors:
+        raise RuntimeError("\n".join(errors) or result.stderr or "Eroare necunoscută la exiftool")
+    append_entry(snapshot, journal_path)
+    return result.stdout
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Anulează scrieri de meta date din jurnal.")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Afișează intrările din jurnal")
+    restore = sub.add_parser("restore", help="Reface valorile dinaintea unei scrieri")
+    restore.add_argument(
+        "entry_id", nargs="?", help="Id-ul intrării (implicit ultima scriere neanulată)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        restored = restored_ids(args.journal)
+        for entry in iter_entries(args.journal):
+            note = f" ({entry['note']})" if entry.get("note") else ""
+            if entry["id"] in restored:
+                note += " [anulată]"
+            print(
+                f"{entry['id']}  {entry['time']}  {len(entry['files'])} fișier(e)  "
+                f"{', '.join(entry['tags'])}{note}"
+            )
+        return
+
+    entry = find_entry(args.entry_id, args.journal)
+    if entry is None:
+        parser.exit(1, "Nu am găsit intrarea în jurnal.\n")
+    try:
+        output = restore_entry(entry, args.journal)
+    except FileNotFoundError:
+        parser.exit(1, "Nu am găsit 'exiftool'. Asigură-te că este instalat și în PATH.\n")
+    except RuntimeError as e:
+        parser.exit(1, f"Eroare: {e}\n")
+    print(output.strip(), file=sys.stderr)
+    print(f"Restaurat: {entry['id']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()